@@ -10,12 +10,18 @@ if not ((sys.version_info.major >= MIN_PYTHON_VERSION_MAJOR) and (sys.version_in
 
 import argparse
 import json
+import mmap
+import re
 from os import path
 from enum import Enum, IntEnum
-from itertools import chain
 from datetime import datetime, timezone, timedelta
-from operator import attrgetter
-from copy import copy
+from operator import attrgetter, itemgetter
+from bisect import bisect_right
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 CMD_INIT = 'init'
 CMD_CALC = 'calc'
@@ -30,6 +36,24 @@ CHANGELOG_KEY_DATETIME_FORMAT = 'datetime format'
 DEFAULT_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
 DEFAULT_UTC_OFFSET_HOURS = 0
 
+DATETIME_FORMAT_DIRECTIVE_PATTERNS = {
+    'Y': r'(?P<year>\d\d\d\d)',
+    'm': r'(?P<month>1[0-2]|0[1-9]|[1-9])',
+    'd': r'(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'H': r'(?P<hour>2[0-3]|[01]\d|\d)',
+    'M': r'(?P<minute>[0-5]\d|\d)',
+    'S': r'(?P<second>6[01]|[0-5]\d|\d)',
+}
+
+# fixed width ISO 8601 formats: separators at every third character from index 4, digits elsewhere
+ISO_DATETIME_FORMAT_SEPARATORS = {
+    '%Y-%m-%d %H:%M': '-- :',
+    '%Y-%m-%d %H:%M:%S': '-- ::',
+    '%Y-%m-%dT%H:%M:%S': '--T::',
+}
+
+_FORMAT_REGEX_CACHE = {}
+
 class ArgumentError(Exception): pass
 class FormatError(Exception): pass
 class MissingKeyFormatError(FormatError): pass
@@ -42,7 +66,74 @@ class InvalidJsonFormatError(FormatError): pass
 class ChangeLogAlreadyExistsError(Exception): pass
 
 
+def _compile_datetime_format(datetime_format):
+    if datetime_format in _FORMAT_REGEX_CACHE:
+        return _FORMAT_REGEX_CACHE[datetime_format]
+
+    # same digit patterns as datetime.strptime; None falls back to strptime for other directives
+    pattern = []
+    used_directives = set()
+    format_chars = iter(datetime_format)
+    for format_char in format_chars:
+        if format_char.isspace():
+            if (not pattern) or (pattern[-1] != r'\s+'):
+                pattern.append(r'\s+')
+            continue
+        if format_char != '%':
+            pattern.append(re.escape(format_char))
+            continue
+        directive = next(format_chars, None)
+        if directive == '%':
+            pattern.append('%')
+        elif (directive in DATETIME_FORMAT_DIRECTIVE_PATTERNS) and (directive not in used_directives):
+            used_directives.add(directive)
+            pattern.append(DATETIME_FORMAT_DIRECTIVE_PATTERNS[directive])
+        else:
+            pattern = None
+            break
+
+    format_regex = None if pattern is None else re.compile(''.join(pattern), re.IGNORECASE)
+    _FORMAT_REGEX_CACHE[datetime_format] = format_regex
+    return format_regex
+
+
+def _get_datetime_parser(datetime_format):
+    # resolve the format once so that parsing each datetime skips the per-format lookups
+    iso_separators = ISO_DATETIME_FORMAT_SEPARATORS.get(datetime_format)
+    iso_length = None if iso_separators is None else 3 * len(iso_separators) + 4
+    format_regex = _compile_datetime_format(datetime_format)
+
+    def parse_datetime(datetime_string, datetime_timezone):
+        if (len(datetime_string) == iso_length) and (datetime_string[4::3] == iso_separators):
+            # fromisoformat is only available since Python 3.7
+            try:
+                return datetime.fromisoformat(datetime_string).replace(tzinfo=datetime_timezone)
+            except (AttributeError, ValueError):
+                pass
+
+        if format_regex is None:
+            return datetime.strptime(datetime_string, datetime_format).replace(tzinfo=datetime_timezone)
+
+        match = format_regex.fullmatch(datetime_string)
+        if match is None:
+            raise ValueError('time data {!r} does not match format {!r}'.format(datetime_string, datetime_format))
+        fields = match.groupdict()
+        return datetime(
+            int(fields.get('year', 1900)),
+            int(fields.get('month', 1)),
+            int(fields.get('day', 1)),
+            int(fields.get('hour', 0)),
+            int(fields.get('minute', 0)),
+            int(fields.get('second', 0)),
+            tzinfo=datetime_timezone,
+        )
+
+    return parse_datetime
+
+
 class Release:
+    __slots__ = ( 'datetime', 'release_class', 'comment' )
+
     def __init__(self, release_datetime, release_class, release_comment = None):
         self.datetime = release_datetime
         self.release_class = release_class
@@ -55,13 +146,16 @@ class ReleaseClass(Enum):
 
     @classmethod
     def get_from_value(klass, value):
-        for release_class in klass:
-            if value == release_class.value:
-                return release_class
-        raise InvalidReleaseClassError('unexpected release class {}'.format(value))
+        # Enum lookup by value is a dict lookup internally
+        try:
+            return klass(value)
+        except ValueError:
+            raise InvalidReleaseClassError('unexpected release class {}'.format(value))
 
 
 class Change:
+    __slots__ = ( 'datetime', 'change_class', 'change_type', 'comment' )
+
     def __init__(self, change_datetime, change_class, change_type, change_comment):
         self.datetime = change_datetime
         self.change_class = change_class
@@ -70,19 +164,27 @@ class Change:
 
 
 class ChangeGroup:
+    __slots__ = ( 'release', 'changes', 'semantic_version' )
+
     def __init__(self, release, changes, previous_semantic_version):
         self.release = release
         self.changes = changes
-        self.semantic_version = copy(previous_semantic_version)
+        self.semantic_version = previous_semantic_version.clone()
+        major = ChangeClass.MAJOR
+        minor = ChangeClass.MINOR
+        patch = ChangeClass.PATCH
         is_major_update_found = False
         is_minor_update_found = False
         is_patch_update_found = False
         for change in changes:
-            if change.change_class == ChangeClass.MAJOR:
+            change_class = change.change_class
+            if change_class is major:
+                # major update takes precedence over the others
                 is_major_update_found = True
-            elif change.change_class == ChangeClass.MINOR:
+                break
+            elif change_class is minor:
                 is_minor_update_found = True
-            elif change.change_class == ChangeClass.PATCH:
+            elif change_class is patch:
                 is_patch_update_found = True
         if is_major_update_found:
             if (previous_semantic_version.major == 0) and (release.release_class == ReleaseClass.PRIVATE):
@@ -103,17 +205,23 @@ class ChangeClass(Enum):
 
     @classmethod
     def get_from_value(klass, value):
-        for change_class in klass:
-            if value == change_class.value:
-                return change_class
-        raise InvalidChangeClassError('unexpected change class {}'.format(value))
+        # Enum lookup by value is a dict lookup internally
+        try:
+            return klass(value)
+        except ValueError:
+            raise InvalidChangeClassError('unexpected change class {}'.format(value))
 
 
 class SemanticVersion:
+    __slots__ = ( 'major', 'minor', 'patch' )
+
     def __init__(self, major = 0, minor = 0, patch = 0):
         self.major = major
         self.minor = minor
         self.patch = patch
+
+    def clone(self):
+        return SemanticVersion(self.major, self.minor, self.patch)
     
     def increment_major(self):
         self.major += 1
@@ -132,24 +240,28 @@ class SemanticVersion:
 
 
 class ChangeLog:
-    def __init__(self, releases, changes):
-        releases.sort(key=attrgetter('datetime'))
-        changes.sort(key=attrgetter('datetime'))
-
+    def __init__(self, releases, changes, presorted = False):
+        if not presorted:
+            releases.sort(key=attrgetter('datetime'))
+            changes.sort(key=attrgetter('datetime'))
+
+        # a change belongs to the first release not before it; bisect finds where each release's changes end
+        change_datetimes = [ change.datetime for change in changes ]
+        change_count = len(changes)
+        first_change_index = 0
         current_version = SemanticVersion()
-        current_release= releases.pop(0)
-        current_changes = []
         self.change_groups = []
-        for change in changes:
-            if change.datetime > current_release.datetime:
-                change_group = ChangeGroup(current_release, current_changes, current_version)
-                current_release = releases.pop(0)
-                current_changes = []
-                current_version = change_group.semantic_version
-                self.change_groups.insert(0, change_group)
-            current_changes.insert(0, change)
-
-        self.change_groups.insert(0, ChangeGroup(current_release, current_changes, current_version))
+        for release in releases:
+            last_change_index = bisect_right(change_datetimes, release.datetime, first_change_index)
+            current_changes = changes[first_change_index:last_change_index]
+            current_changes.reverse()
+            change_group = ChangeGroup(release, current_changes, current_version)
+            current_version = change_group.semantic_version
+            self.change_groups.append(change_group)
+            first_change_index = last_change_index
+            if first_change_index == change_count:
+                break
+        self.change_groups.reverse()
 
 
     def get_latest_version(self):
@@ -159,10 +271,38 @@ class ChangeLog:
     @classmethod
     def parse_changelog(klass, changelog_string):
         try:
-            changelog_data = json.loads(changelog_string)
+            if orjson is not None:
+                changelog_data = orjson.loads(changelog_string)
+            else:
+                changelog_data = json.loads(changelog_string)
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
         except json.JSONDecodeError as e:
-            raise InvalidJsonFormatError('invalid changelog format.\n({})',format(e))
+            raise InvalidJsonFormatError('invalid changelog format.\n({})'.format(e))
+
+        return klass.parse_changelog_data(changelog_data)
+
+    @classmethod
+    def parse_changelog_file(klass, changelog_file_path):
+        try:
+            if orjson is None:
+                with open(changelog_file_path, mode='rt', encoding='utf-8') as fd:
+                    changelog_data = json.load(fd)
+            elif path.getsize(changelog_file_path) == 0:
+                # empty file cannot be mapped
+                changelog_data = orjson.loads(b'')
+            else:
+                # orjson reads the mapped file directly without a copy into a str
+                with open(changelog_file_path, mode='rb') as fd, \
+                     mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as changelog_buffer, \
+                     memoryview(changelog_buffer) as changelog_view:
+                    changelog_data = orjson.loads(changelog_view)
+        except json.JSONDecodeError as e:
+            raise InvalidJsonFormatError('invalid changelog format.\n({})'.format(e))
+
+        return klass.parse_changelog_data(changelog_data)
 
+    @classmethod
+    def parse_changelog_data(klass, changelog_data):
         if CHANGELOG_KEY_DATETIME_FORMAT not in changelog_data:
             datetime_format = DEFAULT_DATETIME_FORMAT
         else:
@@ -172,21 +312,21 @@ class ChangeLog:
             raise MissingKeyFormatError('key {} is required.'.format(CHANGELOG_KEY_UTC_OFFSET_HOURS))
 
         change_timezone = timezone(timedelta(hours=changelog_data[CHANGELOG_KEY_UTC_OFFSET_HOURS]))
+        parse_datetime = _get_datetime_parser(datetime_format)
 
         releases = []
-        releases.append(Release(datetime.max.replace(tzinfo=change_timezone), ReleaseClass.PRIVATE))
         if CHANGELOG_KEY_RELEASES in changelog_data:
-            for release_datetime_string in changelog_data[CHANGELOG_KEY_RELEASES].keys():
+            for release_datetime_string, release_definition in changelog_data[CHANGELOG_KEY_RELEASES].items():
                 assert isinstance(release_datetime_string, str)
                 try:
-                    datetime.strptime(release_datetime_string, datetime_format).replace(tzinfo=change_timezone)
+                    release_datetime = parse_datetime(release_datetime_string, change_timezone)
                 except ValueError as e:
                     raise InvalidDatetimeError('release datetime "{}" is invalid.\n({})'.format(release_datetime_string, e))
-            for release_datetime_string, release_definition in changelog_data[CHANGELOG_KEY_RELEASES].items():
-                release_datetime = datetime.strptime(release_datetime_string, datetime_format).replace(tzinfo=change_timezone)
                 release_class_value, release_comment = next(iter(release_definition.items()))
                 release_class = ReleaseClass.get_from_value(release_class_value)
                 releases.append(Release(release_datetime, release_class, release_comment))
+        releases.sort(key=attrgetter('datetime'))
+        releases.append(Release(datetime.max.replace(tzinfo=change_timezone), ReleaseClass.PRIVATE))
 
         if CHANGELOG_KEY_CHANGE_TYPES not in changelog_data:
             raise MissingKeyFormatError('key {} is required.'.format(CHANGELOG_KEY_CHANGE_TYPES))
@@ -194,34 +334,42 @@ class ChangeLog:
         change_type_definitions = changelog_data[CHANGELOG_KEY_CHANGE_TYPES]
         change_class_values = set(change_type_definitions.keys())
         valid_class_values = set([ change_class.value for change_class in ChangeClass ])
-        change_types = list(chain.from_iterable(change_type_definitions.values()))
-        if len(change_types) != len(set(change_types)):
-            raise InvalidChangeTypeError('change type is duplicated')
-
         if change_class_values != valid_class_values:
             raise InvalidChangeClassError('change classes should be {}'.format(', '.join(valid_class_values)))
 
-        changes = []
+        change_classes_by_type = {}
+        for change_class_value, change_types in change_type_definitions.items():
+            change_class = ChangeClass.get_from_value(change_class_value)
+            for change_type in change_types:
+                if change_type in change_classes_by_type:
+                    raise InvalidChangeTypeError('change type is duplicated')
+                change_classes_by_type[change_type] = change_class
+
+        # sort per datetime key rather than per change; changes under one key share the datetime
+        dated_change_definitions = []
         for change_datetime_string, change_definitions in changelog_data[CHANGELOG_KEY_CHANGES].items():
             assert isinstance(change_datetime_string, str)
             try:
-                change_datetime = datetime.strptime(change_datetime_string, datetime_format).replace(tzinfo=change_timezone)
+                change_datetime = parse_datetime(change_datetime_string, change_timezone)
             except ValueError as e:
                 raise InvalidDatetimeError('change datetime "{}" is invalid.\n({})'.format(change_datetime_string, e))
+            dated_change_definitions.append((change_datetime, change_definitions))
+        dated_change_definitions.sort(key=itemgetter(0))
 
+        changes = []
+        # bound once; these are looked up for every change
+        find_change_class = change_classes_by_type.get
+        append_change = changes.append
+        for change_datetime, change_definitions in dated_change_definitions:
             for change_definition in change_definitions:
                 change_type, change_comment = next(iter(change_definition.items()))
-                found_change_class = None
-                for change_class_value, change_types in change_type_definitions.items():
-                    if change_type in change_types:
-                        found_change_class = ChangeClass.get_from_value(change_class_value)
-                        break
+                found_change_class = find_change_class(change_type)
                 if found_change_class is None:
                     raise InvalidChangeTypeError('change type "{}" is invalid.'.format(change_type))
 
-                changes.append(Change(change_datetime, found_change_class, change_type, change_comment))
+                append_change(Change(change_datetime, found_change_class, change_type, change_comment))
 
-        return klass(releases, changes)
+        return klass(releases, changes, presorted=True)
 
     @classmethod
     def generate_initial_changelog_data(klass, utc_offset_hours):
@@ -266,10 +414,14 @@ class ChangeLog:
                 json.dump(changelog_data, fd, indent=2)
 
     def print_changelog(self):
+        lines = []
         for change_group in self.change_groups:
-            sys.stdout.write('{} ({})\n'.format(change_group.semantic_version, change_group.release.datetime.isoformat()))
-            for change in change_group.changes:
-                sys.stdout.write('- {}: [{}] {}\n'.format(change.datetime.isoformat(), change.change_type, change.comment))
+            lines.append('{} ({})\n'.format(change_group.semantic_version, change_group.release.datetime.isoformat()))
+            lines.extend(
+                '- {}: [{}] {}\n'.format(change.datetime.isoformat(), change.change_type, change.comment)
+                for change in change_group.changes
+            )
+        sys.stdout.write(''.join(lines))
 
     def print_latest_version(self):
         sys.stdout.write('{}\n'.format(self.get_latest_version()))
@@ -321,9 +473,7 @@ if __name__ == '__main__':
         if args.command == CMD_INIT:
             ChangeLog.initialize_changelog(args.file, args.utc_time_offset)
         else:
-            with open(args.file, mode='rt', encoding='utf-8') as fd:
-                changelog_string = fd.read()
-            changelog = ChangeLog.parse_changelog(changelog_string)
+            changelog = ChangeLog.parse_changelog_file(args.file)
             if args.command == CMD_CALC:
                 changelog.print_latest_version()
             elif args.command == CMD_PRINT:
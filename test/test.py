@@ -1,6 +1,7 @@
 import unittest
 import sys
 sys.path.append('..')
+from os import path
 from datetime import datetime
 from bin.changelog import Release
 from bin.changelog import ReleaseClass
@@ -61,6 +62,37 @@ class TestChangeLog(unittest.TestCase):
             self.fail('should raise.')
 
 
+    def test_changelog_invalid_date(self):
+        try:
+            ChangeLog.parse_changelog('''{
+                "changes": {
+                    "2023-02-30 00:00": [
+                        { "valid": "but date does not exist" }
+                    ]
+                },
+                "change types": { "major": [ "valid" ], "minor": [], "patch": [], "internal": [] },
+                "utc offset hours": 9,
+                "datetime format": "%Y-%m-%d %H:%M"
+            }''')
+        except Exception as e:
+            self.assertIsInstance(e, InvalidDatetimeError)
+        else:
+            self.fail('should raise.')
+
+
+    def test_changelog_custom_datetime_format(self):
+        changelog = ChangeLog.parse_changelog('''{
+            "changes": {
+                "30/08/2023 9:05:07": [ { "valid": "" } ]
+            },
+            "change types": { "major": [ "valid" ], "minor": [], "patch": [], "internal": [] },
+            "utc offset hours": 9,
+            "datetime format": "%d/%m/%Y %H:%M:%S"
+        }''')
+        change_datetime = changelog.change_groups[0].changes[0].datetime
+        self.assertEqual(change_datetime.isoformat(), '2023-08-30T09:05:07+09:00')
+
+
     def test_changelog_invalid_release_class(self):
         try:
             ChangeLog.parse_changelog('''{
@@ -123,6 +155,7 @@ class TestChangeLog(unittest.TestCase):
             }''')
         except Exception as e:
             self.assertIsInstance(e, InvalidJsonFormatError)
+            self.assertTrue(str(e).startswith('invalid changelog format.\n('))
         else:
             self.fail('should raise.')
 
@@ -141,6 +174,29 @@ class TestChangeLog(unittest.TestCase):
             self.fail('should raise.')
 
 
+    def test_changelog_release_without_changes(self):
+        changelog = ChangeLog.parse_changelog('''{
+            "releases": {
+                "2023-09-01 00:00": { "public": "" },
+                "2023-09-02 00:00": { "public": "" }
+            },
+            "changes": {
+                "2023-08-31 00:00": [ { "feature": "" } ],
+                "2023-09-03 00:00": [ { "fix": "" } ]
+            },
+            "change types": { "major": [], "minor": [ "feature" ], "patch": [ "fix" ], "internal": [] },
+            "utc offset hours": 9,
+            "datetime format": "%Y-%m-%d %H:%M"
+        }''')
+        self.assertEqual([ len(change_group.changes) for change_group in changelog.change_groups ], [ 1, 0, 1 ])
+        self.assertEqual(str(changelog.get_latest_version()), '0.1.1')
+
+
+    def test_changelog_parse_file(self):
+        changelog = ChangeLog.parse_changelog_file(path.join(path.dirname(path.abspath(__file__)), '..', 'sample', 'changelog.json'))
+        self.assertEqual(str(changelog.get_latest_version()), '0.2.0')
+
+
     def test_changelog_version_1(self):
         release = Release(datetime.now(), ReleaseClass.PRIVATE)
         internal_change = Change(datetime.now(), ChangeClass.INTERNAL, '', '')
@@ -204,6 +260,31 @@ class TestChangeLog(unittest.TestCase):
         self.assertEqual(semantic_version.patch, 0)
 
 
+    def test_changelog_version_8(self):
+        release = Release(datetime.now(), ReleaseClass.PUBLIC)
+        changes = [
+            Change(datetime.now(), ChangeClass.PATCH, '', ''),
+            Change(datetime.now(), ChangeClass.MAJOR, '', ''),
+            Change(datetime.now(), ChangeClass.MINOR, '', ''),
+        ]
+        semantic_version = ChangeGroup(release, changes, SemanticVersion(1, 2, 3)).semantic_version
+        self.assertEqual(semantic_version.major, 2)
+        self.assertEqual(semantic_version.minor, 0)
+        self.assertEqual(semantic_version.patch, 0)
+
+
+    def test_changelog_version_9(self):
+        release = Release(datetime.now(), ReleaseClass.PUBLIC)
+        changes = [
+            Change(datetime.now(), ChangeClass.INTERNAL, '', ''),
+            Change(datetime.now(), ChangeClass.PATCH, '', ''),
+            Change(datetime.now(), ChangeClass.MINOR, '', ''),
+        ]
+        semantic_version = ChangeGroup(release, changes, SemanticVersion(1, 2, 3)).semantic_version
+        self.assertEqual(semantic_version.major, 1)
+        self.assertEqual(semantic_version.minor, 3)
+        self.assertEqual(semantic_version.patch, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file